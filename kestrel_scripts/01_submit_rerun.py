@@ -1,13 +1,41 @@
-import os, sys 
-#sys.path.insert(0,'/ocean/projects/chm240001p/ssonti/kultools')
-print(os.getcwd())
+import os, sys
 from ase import io
-from src.kul_tools import KulTools as KT
-
-kt = KT(gamma_only=False,structure_type='zeo')
-kt.set_calculation_type('opt')
-atoms = io.read('opt_PBE_400_111_run1/CONTCAR')
-atoms.pbc=True
-kt.set_structure(atoms)
-kt.set_overall_vasp_params({'gga':'RP','encut':400,'lreal':'Auto', 'algo':'fast', 'isif':3, 'kpts':(1,1,1)})
-kt.run()
+
+
+def main():
+    # s_rerun_imp2.py submits with `sbatch --export=ALL,RERUN_TARGET=<run folder>/CONTCAR,RERUN_MANIFEST=...`
+    target = os.environ.get('RERUN_TARGET')
+    if not target:
+        print('RERUN_TARGET is not set; submit through s_rerun_imp2.py or export RERUN_TARGET=<run folder>/CONTCAR')
+        return 1
+    # As a job array, each task picks its trajectory folder from the submission's manifest;
+    # large batches are split into several arrays, each starting at RERUN_OFFSET
+    if 'SLURM_ARRAY_TASK_ID' in os.environ:
+        manifest = os.environ.get('RERUN_MANIFEST')
+        if not manifest:
+            print('RERUN_MANIFEST is not set; array tasks need the manifest written by s_rerun_imp2.py')
+            return 1
+        with open(manifest, encoding='utf-8') as f:
+            trajectory_dirs = [line.strip() for line in f if line.strip()]
+        index = int(os.environ.get('RERUN_OFFSET', 0)) + int(os.environ['SLURM_ARRAY_TASK_ID'])
+        os.chdir(trajectory_dirs[index])
+    sys.path.insert(0, os.getcwd())
+    print(os.getcwd())
+    from src.kul_tools import KulTools as KT
+
+    try:
+        atoms = io.read(target)
+    except Exception as e:
+        print(f'Failed to read CONTCAR at {target}: {e}')
+        return 1
+    atoms.pbc=True
+    kt = KT(gamma_only=False,structure_type='zeo')
+    kt.set_calculation_type('opt')
+    kt.set_structure(atoms)
+    kt.set_overall_vasp_params({'gga':'RP','encut':400,'lreal':'Auto', 'algo':'fast', 'isif':3, 'kpts':(1,1,1)})
+    kt.run()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
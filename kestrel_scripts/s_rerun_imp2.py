@@ -1,11 +1,52 @@
 import os
 import argparse
+import json
+import filecmp
 import shutil
 import subprocess
 import re
+import time
+import getpass
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 
 
 CONVERGENCE_MARKER = "reached required accuracy - stopping structural energy minimisation"
+CONVERGENCE_MARKER_BYTES = CONVERGENCE_MARKER.encode()
+# Number of trailing OUTCAR bytes searched for the convergence marker
+OUTCAR_TAIL_BYTES = 64 * 1024
+# Sidecar file in the base folder remembering convergence per OUTCAR (size, mtime)
+CONVERGENCE_CACHE_NAME = ".convergence_cache.json"
+# Files that are always deep-copied into a rerun folder, even with --link
+RERUN_COPY_FILES = ("POSCAR", "INCAR", "KPOINTS", "CONTCAR")
+# Job IDs returned by `sbatch --parsable`, one per line, in the base folder
+SUBMITTED_IDS_NAME = "submitted_ids.txt"
+# sacct states of jobs that have not finished yet
+ACTIVE_JOB_STATES = {"PENDING", "RUNNING", "REQUEUED", "RESIZING", "SUSPENDED", "CONFIGURING", "COMPLETING"}
+# slurmrestd endpoint used by --use-rest; the URL and JWT come from $SLURMRESTD_URL / $SLURM_JWT
+SLURMRESTD_API_VERSION = "v0.0.39"
+# `#SBATCH --<option>` directives forwarded to slurmrestd as job description fields
+REST_DIRECTIVE_FIELDS = {
+    "job-name": "name",
+    "output": "standard_output",
+    "error": "standard_error",
+    "partition": "partition",
+    "account": "account",
+    "qos": "qos",
+    "nodes": "nodes",
+    "tasks-per-node": "tasks_per_node",
+    "cpus-per-task": "cpus_per_task",
+    "time": "time_limit",
+}
+
+_NUM_RE = re.compile(r"trajectory_(\d+)$")
+
+
+def _trajectory_sort_key(name: str) -> int | float:
+    """Sort `trajectory_<N>` numerically; names without a trailing number go last."""
+    m = _NUM_RE.match(name)
+    return int(m.group(1)) if m else float("inf")
 
 
 def find_helper_file(filename: str, helpers_dir: str | None = None) -> str:
@@ -34,147 +75,480 @@ def find_helper_file(filename: str, helpers_dir: str | None = None) -> str:
 
 
 def is_converged(outcar_path: str) -> bool:
-    """Check if OUTCAR contains the required convergence marker line."""
+    """Check if OUTCAR contains the required convergence marker line.
+
+    VASP writes the marker near the end of the run, so only the last
+    `OUTCAR_TAIL_BYTES` are read (the whole file if it is smaller). A plain read is
+    used rather than mmap: OUTCARs may be truncated by a running VASP job, which
+    would raise SIGBUS on a mapped page instead of a catchable error.
+    """
     try:
-        with open(outcar_path, "r", errors="ignore") as f:
-            for line in f:
-                if CONVERGENCE_MARKER in line:
-                    return True
+        with open(outcar_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            f.seek(max(0, size - OUTCAR_TAIL_BYTES))
+            tail = f.read(OUTCAR_TAIL_BYTES)
     except Exception:
         return False
-    return False
+    return CONVERGENCE_MARKER_BYTES in tail
+
+
+def load_convergence_cache(base_folder: str) -> dict:
+    """Load the convergence cache from `base_folder`; returns an empty dict if missing or unreadable."""
+    cache_path = os.path.join(base_folder, CONVERGENCE_CACHE_NAME)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_convergence_cache(base_folder: str, cache: dict) -> None:
+    """Write the convergence cache to `base_folder` (best-effort)."""
+    cache_path = os.path.join(base_folder, CONVERGENCE_CACHE_NAME)
+    try:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+    except OSError as e:
+        print(f"Warning: could not write convergence cache {cache_path}: {e}")
+
+
+def scan_trajectory(traj_dir: str, subfolder_name: str, rerun_dir_name: str) -> tuple[str | None, os.stat_result | None, bool]:
+    """Inspect one trajectory folder with two directory reads instead of per-path stats.
+
+    Returns `(skip_reason, outcar_stat, rerun_exists)`; `skip_reason` is None when
+    `<subfolder_name>/OUTCAR` exists and `outcar_stat` holds its stat.
+    """
+    try:
+        with os.scandir(traj_dir) as it:
+            entries = {entry.name: entry for entry in it}
+        rerun_exists = rerun_dir_name in entries
+        source = entries.get(subfolder_name)
+        if source is None or not source.is_dir():
+            return f"missing subfolder '{subfolder_name}'", None, rerun_exists
+        with os.scandir(source.path) as it:
+            outcar = next((entry for entry in it if entry.name == "OUTCAR"), None)
+        if outcar is None or not outcar.is_file():
+            return f"missing OUTCAR in '{subfolder_name}'", None, rerun_exists
+        return None, outcar.stat(), rerun_exists
+    except OSError as e:
+        return f"cannot read folder ({e})", None, False
+
+
+def check_convergence_cached(outcar_path: str, st: os.stat_result, cached: list | None = None) -> tuple[list, bool]:
+    """Return `([size, mtime_ns], converged)` for `outcar_path` with stat result `st`.
+
+    The OUTCAR is only scanned when its size or mtime differ from `cached`
+    (a `[size, mtime_ns, converged]` entry from the convergence cache). Entries of
+    any other shape are treated as a cache miss.
+    """
+    stamp = [st.st_size, st.st_mtime_ns]
+    if isinstance(cached, list) and len(cached) == 3 and cached[:2] == stamp:
+        return stamp, bool(cached[2])
+    return stamp, is_converged(outcar_path)
+
+
+def _link_or_copy(src: str, dst: str) -> str:
+    """copytree `copy_function`: hardlink `src` to `dst`, deep-copying RERUN_COPY_FILES.
+
+    Falls back to a regular copy when hardlinking fails (e.g. across devices).
+    """
+    if os.path.basename(src) in RERUN_COPY_FILES:
+        return shutil.copy2(src, dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        return shutil.copy2(src, dst)
+    return dst
+
+
+def copy_helper_file(src: str, dst: str) -> None:
+    """Copy helper `src` to `dst`.
+
+    An identical `dst` is left alone; a differing one is kept as `<dst>.bak` and reported.
+    """
+    if os.path.lexists(dst):
+        if os.path.isfile(dst) and filecmp.cmp(src, dst, shallow=False):
+            return
+        backup = f"{dst}.bak"
+        os.replace(dst, backup)
+        print(f"Existing {dst} differs from {src}; moved it to {backup}.")
+    shutil.copy2(src, dst)
+
+
+def clone_calculation_dir(source_dir: str, rerun_dir: str, link: bool = False) -> None:
+    """Copy `source_dir` into `rerun_dir`; with `link=True`, hardlink all but RERUN_COPY_FILES.
+
+    Linked files share storage with the source run. The bundled 01_submit_rerun.py reruns
+    VASP inside the source folder, which rewrites OUTCAR, WAVECAR, CHGCAR, ... in place and
+    would overwrite the linked copies too, so linking is only safe for reruns that write
+    somewhere else. In link mode symlinks are also recreated as symlinks rather than
+    copied as file contents; the default copy dereferences them, like plain `copytree`.
+    """
+    if link:
+        shutil.copytree(source_dir, rerun_dir, symlinks=True, copy_function=_link_or_copy)
+    else:
+        shutil.copytree(source_dir, rerun_dir)
 
 
 def prepare_and_submit_rerun(
-    source_dir: str,
-    run_dir: str,
-    trajectory_dir: str,
-    helpers_dir: str | None = None,
-    copy_to_run_dir: bool = False,
+    base_folder: str,
+    pending: list[str],
+    run_folder_basename: str,
+    src_submit: str,
+    src_script: str,
+    max_concurrent: int = 64,
+    array_size: int = 1000,
+    use_rest: bool = False,
     dry_run: bool = False,
 ) -> None:
-    """Copy rerun helpers into `run_dir` and submit via sbatch.
-
-    - Copies `01_submit_rerun.py` and `script_rerun.sh` from either CWD or script dir
-    - Copies helpers to `trajectory_dir` and (optionally) to `run_dir`
-    - Submits the job from the trajectory directory: `sbatch script_rerun.sh`
+    """Write a rerun manifest for the `pending` trajectory dirs and submit it as Slurm job arrays.
+
+    - Writes `rerun_manifest_<run_folder_basename>_<timestamp>_<pid>.txt` in `base_folder`, one trajectory
+      directory per line; each submission gets its own manifest so queued arrays are never rewritten
+    - Copies the resolved `src_submit` (01_submit_rerun.py) and `src_script` (script_rerun.sh) into `base_folder`
+    - Submits from `base_folder` one array per `array_size` entries, exporting
+      `RERUN_TARGET=<run_folder_basename>/CONTCAR`, `RERUN_MANIFEST` and the array's `RERUN_OFFSET`:
+      `sbatch --array=0-<n-1>%<throttle> --export=ALL,RERUN_TARGET=...,RERUN_MANIFEST=...,RERUN_OFFSET=... script_rerun.sh`
+    - `max_concurrent` is split across the arrays, so at most that many tasks run at once overall
+    - With `use_rest`, submits through slurmrestd instead and falls back to sbatch on failure
     """
-    # Ensure destination exists (already created by caller)
-    os.makedirs(run_dir, exist_ok=True)
-    os.makedirs(trajectory_dir, exist_ok=True)
-
-    # Always (re)generate 01_submit_rerun.py tailored for this run; copy only script_rerun.sh
-    dst_submit_traj = os.path.join(trajectory_dir, "01_submit_rerun.py")
-    dst_script_traj = os.path.join(trajectory_dir, "script_rerun.sh")
-
-    # Write a function-based 01_submit_rerun.py that targets the new run folder
-    # Infer folder name from run_dir basename or source_dir basename? Use run_dir basename
-    run_folder_basename = os.path.basename(run_dir)
-    submit_contents = (
-        "import os, sys\n"
-        "print(os.getcwd())\n"
-        "from ase import io\n"
-        "from src.kul_tools import KulTools as KT\n\n"
-        "def main():\n"
-        f"    target = '{run_folder_basename}/CONTCAR'\n"
-        "    try:\n"
-        "        atoms = io.read(target)\n"
-        "    except Exception as e:\n"
-        "        print(f'Failed to read CONTCAR at {target}: {e}')\n"
-        "        return 1\n"
-        "    atoms.pbc=True\n"
-        "    kt = KT(gamma_only=False,structure_type='zeo')\n"
-        "    kt.set_calculation_type('opt')\n"
-        "    kt.set_structure(atoms)\n"
-        "    kt.set_overall_vasp_params({'gga':'RP','encut':400,'lreal':'Auto', 'algo':'fast', 'isif':3, 'kpts':(1,1,1)})\n"
-        "    kt.run()\n"
-        "    return 0\n\n"
-        "if __name__ == '__main__':\n"
-        "    raise SystemExit(main())\n"
-    )
-    with open(dst_submit_traj, "w", encoding="utf-8") as f:
-        f.write(submit_contents)
-
-    # Copy the sbatch script from helpers_dir or CWD/script dir
-    src_script = find_helper_file("script_rerun.sh", helpers_dir=helpers_dir)
-    shutil.copy2(src_script, dst_script_traj)
-
-    if copy_to_run_dir:
-        dst_submit_run = os.path.join(run_dir, "01_submit_rerun.py")
-        dst_script_run = os.path.join(run_dir, "script_rerun.sh")
-        # Write the same generated submit script into the run folder if requested
-        with open(dst_submit_run, "w", encoding="utf-8") as f:
-            f.write(submit_contents)
-        shutil.copy2(src_script, dst_script_run)
-
-    # Make sure script is executable (best-effort; harmless on Windows)
-    try:
-        mode_traj = os.stat(dst_script_traj).st_mode
-        os.chmod(dst_script_traj, mode_traj | 0o111)
-    except Exception:
-        pass
+    if not pending:
+        print("Nothing to submit: all trajectories converged or skipped.")
+        return
 
+    manifest_name = f"rerun_manifest_{run_folder_basename}_{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}.txt"
+    manifest_path = os.path.abspath(os.path.join(base_folder, manifest_name))
+
+    # Slurm rejects array indices >= MaxArraySize, so large batches are split into
+    # several arrays; each task adds $RERUN_OFFSET to its index into the manifest
+    starts = range(0, len(pending), array_size)
+    # Share the %throttle between the arrays so their sum stays within max_concurrent
+    base_throttle, extra = divmod(max(1, max_concurrent), len(starts))
+    if base_throttle == 0:
+        print(f"Warning: {len(starts)} arrays need at least one running task each; "
+              f"more than --max-concurrent={max_concurrent} tasks may run at once.")
+    chunks: list[tuple[str, dict[str, str], int]] = []
+    for i, start in enumerate(starts):
+        count = min(array_size, len(pending) - start)
+        env = {
+            "RERUN_TARGET": f"{run_folder_basename}/CONTCAR",
+            "RERUN_MANIFEST": manifest_path,
+            "RERUN_OFFSET": str(start),
+        }
+        throttle = max(1, base_throttle + (1 if i < extra else 0))
+        chunks.append((f"0-{count - 1}%{throttle}", env, count))
+
+    # Dry-run stays side-effect free: report the plan without writing the manifest or helpers
     if dry_run:
-        print(f"[DRY-RUN] Would submit: sbatch script_rerun.sh (cwd={trajectory_dir})")
+        print(f"[DRY-RUN] Would write {manifest_name} with {len(pending)} trajectory folder(s) in {base_folder}")
+        print(f"[DRY-RUN] Would copy helpers into {base_folder}: {src_submit}, {src_script}")
+        for array_spec, env, count in chunks:
+            if use_rest:
+                endpoint = f"{os.environ.get('SLURMRESTD_URL', '$SLURMRESTD_URL').rstrip('/')}/slurm/{SLURMRESTD_API_VERSION}/job/submit"
+                print(f"[DRY-RUN] Would POST script_rerun.sh to {endpoint}: array={array_spec}, "
+                      f"{count} task(s), cwd={base_folder}, env+={','.join(f'{k}={v}' for k, v in env.items())} (sbatch on failure)")
+            else:
+                print(f"[DRY-RUN] Would submit: sbatch --array={array_spec} --export={_export_spec(env)} script_rerun.sh (cwd={base_folder})")
         return
 
-    # Submit using sbatch from the run directory
+    dst_submit = os.path.join(base_folder, "01_submit_rerun.py")
+    dst_script = os.path.join(base_folder, "script_rerun.sh")
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        for trajectory_dir in pending:
+            f.write(f"{os.path.abspath(trajectory_dir)}\n")
+
+    # Copy the helpers resolved by the caller; sbatch does not need the script to be executable
+    copy_helper_file(src_submit, dst_submit)
+    copy_helper_file(src_script, dst_script)
+
+    job_ids: list[str | None] = [None] * len(chunks)
+    if use_rest:
+        for i, (array_spec, env, count) in enumerate(chunks):
+            try:
+                job_ids[i] = submit_array_rest(base_folder, dst_script, array_spec, env)
+            except (OSError, ValueError, KeyError) as e:
+                # Don't pay the REST timeout again for every remaining array
+                print(f"slurmrestd submission failed ({e}); falling back to sbatch for the remaining array(s).")
+                break
+            else:
+                print(f"Submitted job array of {count} task(s) via slurmrestd in {base_folder}")
+
+    # Submit the remaining arrays with sbatch (in practice only a handful of calls)
+    for i, (array_spec, env, count) in enumerate(chunks):
+        if job_ids[i] is None:
+            job_ids[i] = submit_array_sbatch(base_folder, array_spec, env, count)
+
+    for job_id in job_ids:
+        if job_id:
+            print(f"Job ID: {job_id}")
+            record_job_id(base_folder, job_id)
+
+
+def _export_spec(env: dict[str, str]) -> str:
+    """Build an `sbatch --export` value that keeps the caller's environment and adds `env`."""
+    return ",".join(["ALL"] + [f"{key}={value}" for key, value in env.items()])
+
+
+def submit_array_sbatch(base_folder: str, array_spec: str, env: dict[str, str], n_tasks: int) -> str | None:
+    """Submit `script_rerun.sh` in `base_folder` with `sbatch --parsable`; returns the job ID or None."""
     try:
         result = subprocess.run(
-            ["sbatch", "script_rerun.sh"],
-            cwd=trajectory_dir,
+            ["sbatch", "--parsable", f"--array={array_spec}", f"--export={_export_spec(env)}", "script_rerun.sh"],
+            cwd=base_folder,
             capture_output=True,
             text=True,
             check=False,
         )
-        print(f"Submitted sbatch in {trajectory_dir} -> returncode={result.returncode}")
-        if result.stdout:
-            print(result.stdout.strip())
-        if result.stderr:
-            print(result.stderr.strip())
     except FileNotFoundError:
         print("Error: 'sbatch' command not found in PATH. Submit manually or load Slurm.")
+        return None
 
+    print(f"Submitted job array of {n_tasks} task(s) in {base_folder} -> returncode={result.returncode}")
+    if result.stderr:
+        print(result.stderr.strip())
+    # --parsable prints "<jobid>" or "<jobid>;<cluster>"
+    job_id = result.stdout.strip().split(";")[0]
+    if result.returncode == 0 and job_id:
+        return job_id
+    if result.stdout:
+        print(result.stdout.strip())
+    return None
 
-def update_submit_io_read(trajectory_dir: str, target_subpath: str) -> None:
-    """Deprecated: no-op. We now rewrite 01_submit_rerun.py per run."""
-    print(f"Info: Skipping regex edit; 01_submit_rerun.py is rewritten to use {target_subpath}.")
 
+def _slurm_time_minutes(value: str) -> int:
+    """Convert a Slurm `--time` value to whole minutes (seconds are rounded up).
 
-def process(base_folder: str, subfolder_name: str, run_index: int, helpers_dir: str | None = None, dry_run: bool = False) -> None:
-    """For each `trajectory_*` directory, check convergence in the given subfolder.
+    Accepts M, M:S, H:M:S, D-H, D-H:M and D-H:M:S.
+    """
+    days, sep, clock = value.partition("-")
+    if not sep:
+        days, clock = "0", value
+    parts = [int(x) for x in clock.split(":")]
+    if sep:
+        # After "D-" the fields are H, H:M or H:M:S
+        parts += [0] * (3 - len(parts))
+        hours, minutes, seconds = parts
+    elif len(parts) == 3:
+        hours, minutes, seconds = parts
+    else:
+        hours = 0
+        minutes, seconds = (parts + [0])[:2]
+    return int(days) * 24 * 60 + hours * 60 + minutes + (1 if seconds else 0)
+
+
+def _rest_job_fields(script_text: str) -> dict:
+    """Translate the `#SBATCH` directives in `script_text` into slurmrestd job fields.
+
+    slurmrestd does not read `#SBATCH` lines itself; only REST_DIRECTIVE_FIELDS are forwarded.
+    """
+    job: dict = {}
+    for line in script_text.splitlines():
+        if not line.startswith("#SBATCH --"):
+            continue
+        option, _, value = line[len("#SBATCH --"):].strip().partition("=")
+        field = REST_DIRECTIVE_FIELDS.get(option)
+        if field is None or not value:
+            continue
+        if field == "time_limit":
+            job[field] = {"set": True, "number": _slurm_time_minutes(value)}
+        elif field in ("tasks_per_node", "cpus_per_task"):
+            job[field] = int(value)
+        else:
+            job[field] = value
+    return job
 
-    If not converged, create `<subfolder_name>_run{run_index}`, copy helper scripts, and submit.
+
+def submit_array_rest(base_folder: str, script_path: str, array_spec: str, extra_env: dict[str, str]) -> str:
+    """Submit `script_path` as a job array through slurmrestd; returns the job ID.
+
+    Requires `$SLURMRESTD_URL` and `$SLURM_JWT` (e.g. from `scontrol token`). Raises
+    OSError for missing configuration or HTTP/connection errors so callers can fall back.
     """
-    # Enumerate trajectory_* directories in the base folder numerically
-    trajectory_dirs = sorted(
-        [d for d in os.listdir(base_folder) if os.path.isdir(os.path.join(base_folder, d)) and d.startswith("trajectory_")],
-        key=lambda x: int(x.split("_")[-1]) if x.split("_")[-1].isdigit() else float("inf"),
+    url = os.environ.get("SLURMRESTD_URL")
+    token = os.environ.get("SLURM_JWT")
+    if not url or not token:
+        raise OSError("SLURMRESTD_URL and SLURM_JWT must be set")
+
+    with open(script_path, "r", encoding="utf-8") as f:
+        script_text = f.read()
+
+    job = _rest_job_fields(script_text)
+    env = dict(os.environ)
+    env.update(extra_env)
+    job.update({
+        "array": array_spec,
+        "current_working_directory": os.path.abspath(base_folder),
+        "environment": [f"{key}={value}" for key, value in env.items()],
+    })
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/slurm/{SLURMRESTD_API_VERSION}/job/submit",
+        data=json.dumps({"script": script_text, "job": job}).encode(),
+        headers={
+            "Content-Type": "application/json",
+            "X-SLURM-USER-NAME": os.environ.get("SLURM_USER_NAME", getpass.getuser()),
+            "X-SLURM-USER-TOKEN": token,
+        },
+        method="POST",
     )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        reply = json.load(response)
+    if reply.get("errors"):
+        raise OSError(f"slurmrestd errors: {reply['errors']}")
+    return str(reply["job_id"])
 
-    for folder in trajectory_dirs:
-        traj_dir = os.path.join(base_folder, folder)
-        source_dir = os.path.join(traj_dir, subfolder_name)
-        outcar_path = os.path.join(source_dir, "OUTCAR")
 
-        if not os.path.isdir(source_dir):
-            print(f"Skipping {folder}: missing subfolder '{subfolder_name}'.")
-            continue
+def record_job_id(base_folder: str, job_id: str) -> None:
+    """Append a submitted job ID to `submitted_ids.txt` in `base_folder`."""
+    with open(os.path.join(base_folder, SUBMITTED_IDS_NAME), "a", encoding="utf-8") as f:
+        f.write(f"{job_id}\n")
+
+
+def read_job_ids(base_folder: str) -> list[str]:
+    """Return the job IDs recorded in `submitted_ids.txt` (empty list if missing)."""
+    try:
+        with open(os.path.join(base_folder, SUBMITTED_IDS_NAME), "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def poll_jobs(base_folder: str, interval: float = 0) -> None:
+    """Report the state of all recorded jobs with one `sacct` call per polling cycle.
+
+    With `interval > 0`, keep polling every `interval` seconds until no job is active.
+    """
+    job_ids = read_job_ids(base_folder)
+    if not job_ids:
+        print(f"No submitted job IDs found in {os.path.join(base_folder, SUBMITTED_IDS_NAME)}.")
+        return
+
+    while True:
+        try:
+            result = subprocess.run(
+                ["sacct", "-j", ",".join(job_ids), "-X", "-P", "-n", "-o", "JobID,State"],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        except FileNotFoundError:
+            print("Error: 'sacct' command not found in PATH. Load Slurm to poll job states.")
+            return
+        if result.returncode != 0:
+            print(result.stderr.strip())
+            return
+
+        counts: dict[str, int] = {}
+        for line in result.stdout.splitlines():
+            if "|" not in line:
+                continue
+            job, state = line.split("|", 1)
+            # States such as "CANCELLED by 1234" carry extra words
+            state = state.split()[0] if state.strip() else "UNKNOWN"
+            counts[state] = counts.get(state, 0) + 1
+            print(f"{job}: {state}")
+        print("Summary: " + ", ".join(f"{state}={n}" for state, n in sorted(counts.items())))
+
+        if interval <= 0 or not ACTIVE_JOB_STATES.intersection(counts):
+            return
+        time.sleep(interval)
+
+
+def update_submit_io_read(trajectory_dir: str, target_subpath: str) -> None:
+    """Deprecated: no-op. 01_submit_rerun.py now reads its target from $RERUN_TARGET."""
+    print(f"Info: Skipping regex edit; pass {target_subpath} to 01_submit_rerun.py via RERUN_TARGET.")
 
-        if not os.path.isfile(outcar_path):
-            print(f"Skipping {folder}: missing OUTCAR in '{subfolder_name}'.")
-            continue
 
-        if is_converged(outcar_path):
+def process(
+    base_folder: str,
+    subfolder_name: str,
+    run_index: int,
+    helpers_dir: str | None = None,
+    max_concurrent: int = 64,
+    scan_workers: int = 32,
+    link: bool = False,
+    array_size: int = 1000,
+    use_rest: bool = False,
+    dry_run: bool = False,
+) -> None:
+    """For each `trajectory_*` directory, check convergence in the given subfolder.
+
+    If not converged, create `<subfolder_name>_run{run_index}`; all reruns are then
+    submitted together as Slurm job array(s) of at most `array_size` tasks.
+    """
+    # Resolve helper scripts once, before touching any trajectory
+    try:
+        src_submit = find_helper_file("01_submit_rerun.py", helpers_dir=helpers_dir)
+        src_script = find_helper_file("script_rerun.sh", helpers_dir=helpers_dir)
+    except FileNotFoundError as e:
+        print(str(e))
+        print("Aborting: reruns cannot be submitted without 01_submit_rerun.py and script_rerun.sh.")
+        return
+
+    # Enumerate trajectory_* directories in the base folder numerically;
+    # scandir's DirEntry.is_dir() avoids an extra stat per entry
+    with os.scandir(base_folder) as it:
+        trajectory_dirs = sorted(
+            [entry.name for entry in it if entry.name.startswith("trajectory_") and entry.is_dir()],
+            key=_trajectory_sort_key,
+        )
+
+    rerun_dir_name = f"{subfolder_name}_run{run_index}"
+    cache = load_convergence_cache(base_folder)
+
+    # Both passes are I/O-latency bound on a parallel FS, so run them on a thread pool
+    with ThreadPoolExecutor(max_workers=max(1, scan_workers)) as ex:
+        # Collect trajectories that have an OUTCAR to check (one scandir per level)
+        scans = ex.map(
+            scan_trajectory,
+            [os.path.join(base_folder, folder) for folder in trajectory_dirs],
+            repeat(subfolder_name),
+            repeat(rerun_dir_name),
+        )
+        candidates: list[tuple[str, str, str, os.stat_result, bool]] = []
+        for folder, (skip_reason, st, rerun_exists) in zip(trajectory_dirs, scans):
+            if skip_reason is not None:
+                print(f"Skipping {folder}: {skip_reason}.")
+                continue
+            source_dir = os.path.join(base_folder, folder, subfolder_name)
+            candidates.append((folder, source_dir, os.path.join(source_dir, "OUTCAR"), st, rerun_exists))
+
+        # Unchanged OUTCARs (same size and mtime as last time) are answered from the cache
+        cache_keys = [os.path.relpath(outcar_path, base_folder) for _, _, outcar_path, _, _ in candidates]
+        results = list(ex.map(
+            check_convergence_cached,
+            [outcar_path for _, _, outcar_path, _, _ in candidates],
+            [st for _, _, _, st, _ in candidates],
+            [cache.get(key) for key in cache_keys],
+        ))
+
+    converged = []
+    for key, (stamp, done) in zip(cache_keys, results):
+        cache[key] = stamp + [done]
+        converged.append(done)
+
+    # Drop stale entries for this subfolder only; other subfolders' entries are kept
+    scanned = set(cache_keys)
+    for key in list(cache):
+        parts = key.split(os.sep)
+        if len(parts) == 3 and parts[1] == subfolder_name and parts[2] == "OUTCAR" and key not in scanned:
+            del cache[key]
+    if candidates and not dry_run:
+        save_convergence_cache(base_folder, cache)
+
+    pending: list[str] = []
+    for (folder, source_dir, _, _, rerun_exists), done in zip(candidates, converged):
+        traj_dir = os.path.join(base_folder, folder)
+
+        if done:
             print(f"Converged: {folder}/{subfolder_name}")
             continue
 
         print(f"Not converged: {folder}/{subfolder_name} -> creating rerun folder")
 
-        rerun_dir_name = f"{subfolder_name}_run{run_index}"
         rerun_dir = os.path.join(traj_dir, rerun_dir_name)
 
-        rerun_exists = os.path.exists(rerun_dir)
         if rerun_exists:
             print(f"Rerun folder already exists: {folder}/{rerun_dir_name}. Will reuse it.")
         else:
@@ -182,37 +556,55 @@ def process(base_folder: str, subfolder_name: str, run_index: int, helpers_dir:
             if dry_run:
                 print(f"[DRY-RUN] Would copy folder: {source_dir} -> {rerun_dir}")
             else:
-                shutil.copytree(source_dir, rerun_dir)
-
-        # Copy helper scripts and submit job
-        try:
-            prepare_and_submit_rerun(
-                source_dir=source_dir,
-                run_dir=rerun_dir,
-                trajectory_dir=traj_dir,
-                helpers_dir=helpers_dir,
-                copy_to_run_dir=False,
-                dry_run=dry_run,
-            )
-        except FileNotFoundError as e:
-            print(str(e))
-            print(f"Skipping submission for {folder}/{rerun_dir_name} due to missing helper file(s).")
-            continue
-
-        # The generated 01_submit_rerun.py is already targeting the new run folder
+                clone_calculation_dir(source_dir, rerun_dir, link=link)
+
+        pending.append(traj_dir)
+
+    # Submit all pending reruns as one job array
+    prepare_and_submit_rerun(
+        base_folder=base_folder,
+        pending=pending,
+        run_folder_basename=rerun_dir_name,
+        src_submit=src_submit,
+        src_script=src_script,
+        max_concurrent=max_concurrent,
+        array_size=max(1, array_size),
+        use_rest=use_rest,
+        dry_run=dry_run,
+    )
 
 
 def main():
     parser = argparse.ArgumentParser(description="Check VASP convergence and rerun non-converged jobs.")
     parser.add_argument("--base", required=True, help="Base folder containing trajectory_* directories")
-    parser.add_argument("--folder", required=True, help="Subfolder inside trajectory folders (e.g., opt_PBE_400_111)")
-    parser.add_argument("--run", required=True, type=int, help="Run index used for _run<index> suffix")
+    parser.add_argument("--folder", default=None, help="Subfolder inside trajectory folders (e.g., opt_PBE_400_111)")
+    parser.add_argument("--run", default=None, type=int, help="Run index used for _run<index> suffix")
     parser.add_argument("--helpers-dir", default=None, help="Directory containing 01_submit_rerun.py and script_rerun.sh")
+    parser.add_argument("--max-concurrent", default=64, type=int,
+                        help="Maximum number of rerun tasks running at once; split across arrays as their %%N throttles")
+    parser.add_argument("--workers", default=32, type=int, help="Number of threads used to scan OUTCARs for convergence")
+    parser.add_argument("--link", action="store_true",
+                        help="Hardlink files into the rerun folder instead of copying them "
+                             "(unsafe if the rerun writes into the source folder, as 01_submit_rerun.py does)")
+    parser.add_argument("--array-size", default=1000, type=int, help="Maximum tasks per job array (keep below Slurm's MaxArraySize)")
+    parser.add_argument("--use-rest", action="store_true", help="Submit via slurmrestd ($SLURMRESTD_URL, $SLURM_JWT); falls back to sbatch")
     parser.add_argument("--dry-run", action="store_true", help="Do not modify files or submit jobs; just print actions")
+    parser.add_argument("--poll", action="store_true", help="Report states of jobs listed in submitted_ids.txt instead of submitting")
+    parser.add_argument("--poll-interval", default=0, type=float, help="With --poll, repeat every N seconds until all jobs finish")
 
     args = parser.parse_args()
 
-    process(args.base, args.folder, run_index=args.run, helpers_dir=args.helpers_dir, dry_run=args.dry_run)
+    if args.poll:
+        poll_jobs(args.base, interval=args.poll_interval)
+        return
+
+    if args.folder is None or args.run is None:
+        parser.error("--folder and --run are required unless --poll is given")
+
+    process(args.base, args.folder, run_index=args.run, helpers_dir=args.helpers_dir,
+            max_concurrent=args.max_concurrent, scan_workers=args.workers,
+            link=args.link, array_size=args.array_size,
+            use_rest=args.use_rest, dry_run=args.dry_run)
 
 
 if __name__ == "__main__":
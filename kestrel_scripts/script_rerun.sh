@@ -1,7 +1,7 @@
 #!/bin/bash
 #SBATCH --job-name=osda_insertion
-#SBATCH --output=job.out
-#SBATCH --error=job.err
+#SBATCH --output=job_%A_%a.out
+#SBATCH --error=job_%A_%a.err
 #SBATCH --partition=short
 #SBATCH --account=zeocrystal
 #SBATCH --time=04:00:00